@@ -6,12 +6,14 @@ import configparser
 import functools
 import itertools
 import re
+import sys
 
 
 __version__ = '1.0.1'
 __all__ = [
     'ConfigSchema',
     'ConfigSchemaValidator',
+    'ConfigSnapshot',
 
     'ConfigError',
 
@@ -32,6 +34,8 @@ __all__ = [
 
 class ItemBaseValidator:
     """Base class for item validators"""
+    __slots__ = ()
+
     def setup(self):
         pass
 
@@ -46,19 +50,22 @@ def item_validator(name, func):
     """Class factory for item validators"""
     return type(name, (ItemBaseValidator,),
                 dict(
-                    __call__=lambda _, x: func(x),
+                    __slots__=(),
+                    __call__=staticmethod(func),
                     setup=lambda _: None,
                     teardown=lambda _: True,
                 ))
 
 
 ItemDefaultValidator = item_validator('ItemDefaultValidator', lambda _: True)
+_DEFAULT_VALIDATOR = ItemDefaultValidator()
 
 
 def _validator_safe_call(validator, value):
-    with contextlib.suppress(Exception):
+    try:
         return validator(value)
-    return False
+    except Exception:
+        return False
 
 
 def _check_is_base_validator(validator):
@@ -67,8 +74,14 @@ def _check_is_base_validator(validator):
             '{!r} is not an instance of ItemBaseValidator'.format(validator))
 
 
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
 class ItemNotValidator(ItemBaseValidator):
     """Logical NOT"""
+    __slots__ = ('validator',)
+
     def __init__(self, validator):
         _check_is_base_validator(validator)
 
@@ -88,11 +101,14 @@ class ItemNotValidator(ItemBaseValidator):
 
 class ItemOrValidator(ItemBaseValidator):
     """Logical OR"""
+    __slots__ = ('validators', '_alternatives')
+
     def __init__(self, *validators):
         for val in validators:
             _check_is_base_validator(val)
 
         self.validators = validators
+        self._alternatives = _fuse_validators(validators)
 
     def setup(self):
         for val in self.validators:
@@ -100,7 +116,8 @@ class ItemOrValidator(ItemBaseValidator):
 
     def __call__(self, value):
         """Returns `True` if any `validators` returns `True`"""
-        return any(_validator_safe_call(val, value) for val in self.validators)
+        return any(map(_validator_safe_call, self._alternatives,
+                       itertools.repeat(value)))
 
     def teardown(self):
         """Returns `True` if any `validators` ends with `True`"""
@@ -109,6 +126,8 @@ class ItemOrValidator(ItemBaseValidator):
 
 class ItemAndValidator(ItemBaseValidator):
     """Logical AND"""
+    __slots__ = ('validators',)
+
     def __init__(self, *validators):
         for val in validators:
             _check_is_base_validator(val)
@@ -121,7 +140,8 @@ class ItemAndValidator(ItemBaseValidator):
 
     def __call__(self, value):
         """Returns `True` if all `validators` returns `True`"""
-        return all(_validator_safe_call(val, value) for val in self.validators)
+        return all(map(_validator_safe_call, self.validators,
+                       itertools.repeat(value)))
 
     def teardown(self):
         """Returns `True` if all `validators` ends with `True`"""
@@ -130,6 +150,8 @@ class ItemAndValidator(ItemBaseValidator):
 
 class ItemCountValidator(ItemBaseValidator):
     """Counting validator"""
+    __slots__ = ('validator', 'check_fn', 'count')
+
     def __init__(self, validator, check_fn):
         """Initializes counting validator by a `validator` and counting
         function `check_fn`"""
@@ -153,6 +175,26 @@ class ItemCountValidator(ItemBaseValidator):
 
         return False
 
+    def _count_accepted(self, values):
+        return sum(map(bool, map(
+            _validator_safe_call, itertools.repeat(self.validator), values)))
+
+    def feed(self, values):
+        """Calls counting validator for each of `values` at once. Returns
+        the validator itself"""
+        self._add_count(self._count_accepted(values))
+        return self
+
+    def validate_batch(self, values):
+        """Returns `True` if `check_fn` accepts number of `values` accepted
+        by `validator`. Does not change the state of counting validator"""
+        return self.check_fn(self._count_accepted(values))
+
+    def _add_count(self, count):
+        """Adds `count` accepted values to the counter, as if `validator`
+        was called for each of them"""
+        self.count += count
+
     def teardown(self):
         """Returns `True` if `check_fn` accepts number of successed calls
         underlying `validator`"""
@@ -161,55 +203,219 @@ class ItemCountValidator(ItemBaseValidator):
 
 class ItemStringValidator(ItemBaseValidator):
     """String validator"""
+    __slots__ = ('value', 'ignore_case', '_folded')
+
     def __init__(self, expected, ignore_case=False):
         if not isinstance(expected, str):
             raise TypeError('{!r} is not a string'.format(expected))
 
-        self.value = expected
+        self.value = _intern(expected)
         self.ignore_case = ignore_case
+        self._folded = expected.casefold() if ignore_case else None
 
     def __call__(self, value):
         """Returns `True` if `value` is equals to `expected`"""
         if self.ignore_case:
-            return self.value.casefold() == value.casefold()
+            return self._folded == value.casefold()
 
         return self.value == value
 
 
+@functools.lru_cache(maxsize=4096)
+def _compile_regex(pattern, flags=0):
+    return re.compile(pattern, flags)
+
+
+_REGEX_RESULTS_CACHE_SIZE = 256
+
+
 class ItemRegexValidator(ItemBaseValidator):
     """Regular expression validator"""
-    def __init__(self, regex):
-        self.regexp = re.compile(regex)
+    __slots__ = ('regexp', '_fullmatch', '_matches')
+
+    def __init__(self, regex, ignore_case=False):
+        self.regexp = _compile_regex(regex,
+                                     re.IGNORECASE if ignore_case else 0)
+        fullmatch = self._fullmatch = self.regexp.fullmatch
+        self._matches = functools.lru_cache(_REGEX_RESULTS_CACHE_SIZE)(
+            lambda value: fullmatch(value) is not None)
 
     def __call__(self, value):
-        """Returns `True` if `regex` full matches `value`"""
-        return bool(self.regexp.fullmatch(value))
+        """Returns `True` if `regex` full matches `value`. Results for the
+        recently checked strings are remembered"""
+        if type(value) is not str and type(value) is not bytes:
+            return self._fullmatch(value) is not None
+
+        return self._matches(value)
 
 
 class ItemNumberValidator(ItemBaseValidator):
     """Non-negative number validator"""
+    __slots__ = ()
+
     def __call__(self, value):
         """Returns `True` if `value` may be interpreted as non-negative
         number"""
+        if isinstance(value, str):
+            value = value.strip()
+            if value.isdecimal():
+                return True
+            if value[:1] not in '+-' and '_' not in value:
+                return False
+
         try:
             return int(value) >= 0
         except ValueError:
             return False
 
 
-_ValidatorItem = collections.namedtuple(
-    '_ValidatorItem', ('key_val', 'value_val'))
+_DEFAULT_REGEX_FLAGS = re.compile('').flags
+
+
+def _regex_source(validator):
+    """Returns regular expression equivalent to `validator` or `None` if
+    it can not be merged with others"""
+    if type(validator) is ItemStringValidator and not validator.ignore_case:
+        return re.escape(validator.value)
+
+    if type(validator) is ItemRegexValidator:
+        regexp = validator.regexp
+        if (not isinstance(regexp.pattern, str) or regexp.groups != 0 or
+                _compile_regex(regexp.pattern).flags != _DEFAULT_REGEX_FLAGS):
+            return None
+        if regexp.flags == _DEFAULT_REGEX_FLAGS:
+            return regexp.pattern
+        if regexp.flags == _DEFAULT_REGEX_FLAGS | re.IGNORECASE:
+            return '(?i:{})'.format(regexp.pattern)
+
+    return None
+
+
+class _ItemSetValidator(ItemBaseValidator):
+    """Checks that a value is one of given strings"""
+    __slots__ = ('values',)
+
+    def __init__(self, values):
+        self.values = frozenset(values)
+
+    def __call__(self, value):
+        return value in self.values
+
+
+def _fuse_validators(validators):
+    """Replaces every run of adjacent string and regex validators by a
+    single validator matching any of them: `_ItemSetValidator` if all of
+    them are strings and `ItemRegexValidator` otherwise"""
+    result = []
+    for (mergeable, group) in itertools.groupby(
+            validators, lambda val: _regex_source(val) is not None):
+        group = list(group)
+        if mergeable and len(group) > 1:
+            if all(type(val) is ItemStringValidator for val in group):
+                group = [_ItemSetValidator(val.value for val in group)]
+            else:
+                with contextlib.suppress(re.error):
+                    group = [ItemRegexValidator('|'.join(
+                        '(?:{})'.format(_regex_source(val))
+                        for val in group))]
+        result.extend(group)
+
+    return tuple(result)
+
+
+class _ValidatorItem:
+    __slots__ = ('key_val', 'value_val')
+
+    def __init__(self, key_val, value_val):
+        self.key_val = key_val
+        self.value_val = value_val
+
+
+def _literal_key(validator):
+    """Returns expected string if `validator` is an exact case-sensitive
+    `ItemStringValidator` (possibly wrapped into `ItemCountValidator`) or
+    `None` otherwise"""
+    if type(validator) is ItemCountValidator:
+        validator = validator.validator
+
+    if type(validator) is ItemStringValidator and not validator.ignore_case:
+        return validator.value
+
+    return None
+
+
+_SchemaPlan = collections.namedtuple(
+    '_SchemaPlan', ('key_vals',
+                    'req_values', 'req_literal', 'req_dynamic', 'req_counted',
+                    'opt_values', 'opt_literal', 'opt_dynamic', 'opt_counted'))
+
+
+def _fuse_dynamic(dynamic):
+    """Replaces every run of adjacent regex key validators in `dynamic` by
+    a single pattern with a capturing group per validator. Returns tuple of
+    `(index, validator, indexes)`, where `indexes` maps groups of a merged
+    pattern to validator indexes and is `None` for other validators"""
+    result = []
+    for (mergeable, group) in itertools.groupby(
+            dynamic, lambda item: _regex_source(item[1]) is not None):
+        group = list(group)
+        if mergeable and len(group) > 1:
+            with contextlib.suppress(re.error):
+                regexp = re.compile('|'.join(
+                    '({})'.format(_regex_source(key_val))
+                    for (_, key_val) in group))
+                indexes = tuple(idx for (idx, _) in group)
+                result.append((indexes[0], regexp.fullmatch, indexes))
+                continue
+
+        result.extend((idx, key_val, None) for (idx, key_val) in group)
+
+    return tuple(result)
+
+
+def _split_keys(items):
+    """Splits `_ValidatorItem`s into value validators, dict of literal keys,
+    other key validators and literal counting key validators"""
+    literal = {}
+    (dynamic, counted) = ([], [])
+
+    for (idx, item) in enumerate(items):
+        expected = _literal_key(item.key_val)
+        if expected is None:
+            dynamic.append((idx, item.key_val))
+        else:
+            literal.setdefault(expected, idx)
+            if type(item.key_val) is ItemCountValidator:
+                counted.append((idx, item.key_val))
+
+    return (tuple(item.value_val for item in items), literal,
+            _fuse_dynamic(dynamic), tuple(counted))
 
 
 class _BaseValidator:
+    __slots__ = ('reqs', 'opts', 'fail_other', '_plan')
+
     def __init__(self):
         self.reqs = []
         self.opts = []
         self.fail_other = False
+        self._plan = None
 
     def _add_value(self, key, value, required=True):
         ptr_vals = self.reqs if required else self.opts
         ptr_vals.append(_ValidatorItem(key, value))
+        self._plan = None
+        return self
+
+    def finalize(self):
+        """Precomputes lookup structures used by validation. It is called
+        on first validation and repeated after the schema is changed"""
+        if self._plan is None:
+            self._plan = _SchemaPlan(
+                tuple(val.key_val
+                      for val in itertools.chain(self.reqs, self.opts)),
+                *(_split_keys(self.reqs) + _split_keys(self.opts)))
+
         return self
 
     @staticmethod
@@ -227,8 +433,10 @@ class _BaseValidator:
 
 class _SectionValidator(_BaseValidator):
     """Allows to describe a scheme for section of config validation"""
+    __slots__ = ()
+
     def value(self, key_val, required=True,
-              value_val=ItemDefaultValidator()):
+              value_val=_DEFAULT_VALIDATOR):
         """Describes a values in a section in configuration. `key_val` is
         validator for key of value, `value_val` is validator for value of
         value"""
@@ -240,6 +448,8 @@ class _SectionValidator(_BaseValidator):
 
 class ConfigSchema(_BaseValidator):
     """Allows to describe a scheme for config validation"""
+    __slots__ = ()
+
     @contextlib.contextmanager
     def section(self, name_val, required=True):
         """Describes a section in configuration. `name_val` is validator for
@@ -250,6 +460,16 @@ class ConfigSchema(_BaseValidator):
         yield validator
         self._add_value(name, validator, required)
 
+    def finalize(self):
+        """Precomputes lookup structures of the schema and all its
+        sections"""
+        if self._plan is None:
+            super().finalize()
+            for val in itertools.chain(self.reqs, self.opts):
+                val.value_val.finalize()
+
+        return self
+
 
 class ConfigError(Exception):
     """Base exception-class for validation errors"""
@@ -283,9 +503,66 @@ class ExpectedValuesError(ConfigError):
 
 class ValueValidationError(ConfigError):
     def __init__(self, val, section, key, validator_name):
-        super().__init__(
-            'Wrong value in section "{}", key "{}": "{}" ({})'.format(
-                section, key, val, validator_name))
+        super().__init__(val, section, key, validator_name)
+
+    def __str__(self):
+        (val, section, key, validator_name) = self.args
+        return 'Wrong value in section "{}", key "{}": "{}" ({})'.format(
+            section, key, val, validator_name)
+
+
+_INTERPOLATION_MARKERS = {
+    configparser.Interpolation: None,
+    configparser.BasicInterpolation: '%',
+    configparser.ExtendedInterpolation: '$',
+}
+
+
+def _section_items(section):
+    """Returns items of `section`. Items are read directly from the parser
+    storage if none of them needs interpolation"""
+    if type(section) is not configparser.SectionProxy:
+        return section.items()
+
+    parser = section.parser
+    interpolation = type(parser._interpolation)
+    if (type(parser).get is not configparser.RawConfigParser.get or
+            interpolation not in _INTERPOLATION_MARKERS):
+        return section.items()
+
+    items = parser._sections[section.name]
+    if parser._defaults:
+        items = collections.OrderedDict(items)
+        for (key, value) in parser._defaults.items():
+            items.setdefault(key, value)
+
+    marker = _INTERPOLATION_MARKERS[interpolation]
+    if marker is not None and any(isinstance(value, str) and marker in value
+                                  for value in items.values()):
+        return section.items()
+
+    return items.items()
+
+
+class ConfigSnapshot:
+    """Immutable copy of sections and values of `RawConfigParser`.
+    Validation of a snapshot skips reading values from the parser, so it is
+    faster when the same config is validated many times. All values of all
+    sections are read and interpolated up front, so interpolation errors
+    are raised by the constructor even for sections a schema never
+    describes"""
+    __slots__ = ('sections',)
+
+    def __init__(self, config):
+        if not isinstance(config, configparser.RawConfigParser):
+            raise TypeError(
+                '{!r} is not an instance of RawConfigParser'.format(config))
+
+        self.sections = tuple(
+            (_intern(name), tuple((_intern(key), value)
+                                  for (key, value)
+                                  in _section_items(config[name])))
+            for name in config.sections())
 
 
 class ConfigSchemaValidator:
@@ -299,81 +576,137 @@ class ConfigSchemaValidator:
         self._schema = schema
 
     def validate(self, config):
-        """Validates `config` which is `ConfigParser` by schema.
-        Returns `True` if config is valid or raises `ConfigError` otherwise"""
-        if not isinstance(config, configparser.ConfigParser):
+        """Validates `config` which is `ConfigParser`, `RawConfigParser` or
+        `ConfigSnapshot` by schema. Returns `True` if config is valid or
+        raises `ConfigError` otherwise"""
+        if isinstance(config, ConfigSnapshot):
+            sections = config.sections
+        elif isinstance(config, configparser.RawConfigParser):
+            sections = ((name, _section_items(config[name]))
+                        for name in config.sections())
+        else:
             raise TypeError(
-                '{!r} is not an instance of ConfigParser'.format(config))
+                '{!r} is not an instance of RawConfigParser'.format(config))
 
-        ConfigSchemaValidator._validate_config(config, self._schema)
+        ConfigSchemaValidator._validate_config(sections, self._schema)
         return True
 
     @staticmethod
-    def _validate(items, schema, next_validator):
-        req_validators = list(schema.reqs)
-        req_vals_pass = [False]*len(req_validators)
+    def _match(name, idx, dynamic):
+        """Returns index of the first validator accepting `name` or `None`.
+        `idx` is the index of the literal key equal to `name`, validators
+        from `dynamic` are called only if they precede it"""
+        for (i, key_val, indexes) in dynamic:
+            if idx is not None and i > idx:
+                break
+
+            rv = _validator_safe_call(key_val, name)
+            if rv and indexes is not None:
+                i = indexes[rv.lastindex - 1]
+                return i if idx is None or i < idx else idx
+            if rv:
+                return i
+
+        return idx
+
+    @staticmethod
+    def _validate(items, schema, route):
+        """Matches keys of `items` against `schema` and passes
+        `(value, value_val, name)` of every matched item to `route` as soon
+        as it is matched. `items` are read lazily"""
+        plan = schema.finalize()._plan
+        (req_values, opt_values) = (plan.req_values, plan.opt_values)
+        (req_dynamic, opt_dynamic) = (plan.req_dynamic, plan.opt_dynamic)
+        (req_counted, opt_counted) = (plan.req_counted, plan.opt_counted)
+        (req_literal_get, opt_literal_get) = (
+            plan.req_literal.get, plan.opt_literal.get)
+        match = ConfigSchemaValidator._match
+
+        req_vals_pass = bytearray(len(req_values))
+        (req_hits, opt_hits) = ([], [])
         other = []
 
-        for val in itertools.chain(schema.reqs, schema.opts):
-            val.key_val.setup()
+        for key_val in plan.key_vals:
+            key_val.setup()
 
         for (name, value) in items:
-            for (i, validator) in enumerate(req_validators):
-                if _validator_safe_call(validator.key_val, name):
-                    req_vals_pass[i] = True
-                    next_validator(value, validator.value_val, name)
-                    break
+            i = req_literal_get(name)
+            if req_dynamic:
+                i = match(name, i, req_dynamic)
+            if i is not None:
+                req_vals_pass[i] = 1
+                if req_counted:
+                    req_hits.append(i)
+                route((value, req_values[i], name))
+                continue
+
+            i = opt_literal_get(name)
+            if opt_dynamic:
+                i = match(name, i, opt_dynamic)
+            if i is not None:
+                if opt_counted:
+                    opt_hits.append(i)
+                route((value, opt_values[i], name))
             else:
-                for validator in schema.opts:
-                    if _validator_safe_call(validator.key_val, name):
-                        next_validator(value, validator.value_val, name)
-                        break
-                else:
-                    other.append(name)
-
-        all_completed = all(
-            val.key_val.teardown()
-            for val in itertools.chain(schema.reqs, schema.opts))
+                other.append(name)
+
+        for (hits, counted) in ((req_hits, req_counted),
+                                (opt_hits, opt_counted)):
+            if counted:
+                tally = collections.Counter(hits)
+                for (i, key_val) in counted:
+                    key_val._add_count(tally[i])
+
+        all_completed = all(key_val.teardown() for key_val in plan.key_vals)
         return (all(req_vals_pass) and all_completed, other)
 
     @staticmethod
-    def _check(validate_rv, schema, ok_exc, other_exc):
+    def _check(validate_rv, schema, ok_exc, other_exc, *args):
+        """Raises `ok_exc(*args)` if `validate_rv` is not ok or `other_exc`
+        with unexpected names if they are not allowed by `schema`"""
         (ok, other) = validate_rv
 
         if not ok:
-            raise ok_exc
+            raise ok_exc(*args)
 
         if other and schema.fail_other:
-            raise other_exc
+            raise other_exc(*(args + (other,)))
 
     @staticmethod
-    def _validate_config(config, schema):
+    def _validate_config(config_sections, schema):
+        sections = collections.deque()
         rv = ConfigSchemaValidator._validate(
-            ((name, config[name]) for name in config.sections()), schema,
-            ConfigSchemaValidator._validate_section)
+            config_sections, schema, sections.append)
 
-        ConfigSchemaValidator._check(
-            rv, schema, ExpectedSectionsError(),
-            UnexpectedSectionsError(rv[1]))
+        while sections:
+            (items, sect_schema, sect_name) = sections.popleft()
 
-    @staticmethod
-    def _validate_section(section, schema, sect_name):
-        rv = ConfigSchemaValidator._validate(
-            section.items(), schema, functools.partial(
-                ConfigSchemaValidator._validate_value, section=sect_name))
+            def validate_value(item, section=sect_name):
+                (value, validator, key) = item
+                ConfigSchemaValidator._validate_value(
+                    value, validator, key, section)
+
+            sect_rv = ConfigSchemaValidator._validate(
+                items, sect_schema, validate_value)
+
+            ConfigSchemaValidator._check(
+                sect_rv, sect_schema, ExpectedValuesError,
+                UnexpectedValuesError, sect_name)
 
         ConfigSchemaValidator._check(
-            rv, schema, ExpectedValuesError(sect_name),
-            UnexpectedValuesError(sect_name, rv[1]))
+            rv, schema, ExpectedSectionsError, UnexpectedSectionsError)
 
     @staticmethod
     def _validate_value(value, validator, key, section):
-        err = ValueValidationError(value, section, key,
-                                   type(validator).__name__)
+        if validator is _DEFAULT_VALIDATOR:
+            return
+
         try:
             rv = validator(value)
         except Exception as e:
-            raise err from e
+            raise ValueValidationError(
+                value, section, key, type(validator).__name__) from e
 
         if not rv:
-            raise err
+            raise ValueValidationError(
+                value, section, key, type(validator).__name__)
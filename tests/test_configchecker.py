@@ -1,7 +1,8 @@
 import configchecker as t
-import functools
+import configparser
+import sys
 import unittest
-from configparser import ConfigParser
+from configparser import ConfigParser, RawConfigParser
 
 
 class ItemValidatorsTests(unittest.TestCase):
@@ -31,6 +32,13 @@ class ItemValidatorsTests(unittest.TestCase):
         self.assertFalse(val(-12))
         self.assertFalse(val("-12"))
         self.assertFalse(val("wrong"))
+        self.assertTrue(val("+5"))
+        self.assertTrue(val("-0"))
+        if sys.version_info >= (3, 6):
+            self.assertTrue(val("4_2"))
+        self.assertTrue(val(" 42 "))
+        self.assertFalse(val(""))
+        self.assertFalse(val("\u00b2"))
 
     def test_regex_validator(self):
         val = t.ItemRegexValidator(r'[a-zA-Z]+')
@@ -41,6 +49,30 @@ class ItemValidatorsTests(unittest.TestCase):
         self.assertFalse(val("str123"))
         self.assertFalse(val("123str"))
 
+        val = t.ItemRegexValidator(r'\d+')
+        for i in range(300):
+            self.assertTrue(val(str(i)))
+        info = val._matches.cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize),
+                         (0, 300, 256))
+
+        self.assertTrue(val("299"))
+        self.assertFalse(val("x299"))
+        self.assertFalse(val("x299"))
+        self.assertTrue(val("0"))
+        info = val._matches.cache_info()
+        self.assertEqual((info.hits, info.misses), (2, 302))
+
+        val = t.ItemRegexValidator(rb'\d+')
+        self.assertTrue(val(bytearray(b'12')))
+        self.assertTrue(val(b'12'))
+        self.assertFalse(val(bytearray(b'1x')))
+
+        val = t.ItemRegexValidator(r'[a-z]+', ignore_case=True)
+        self.assertTrue(val("string"))
+        self.assertTrue(val("SomeString"))
+        self.assertFalse(val("str123"))
+
     def test_not_validator(self):
         val = t.ItemNotValidator(t.ItemStringValidator("wrong"))
         self.assertIsInstance(val, t.ItemBaseValidator)
@@ -83,6 +115,16 @@ class ItemValidatorsTests(unittest.TestCase):
             val("ok")
             self.assertTrue(val.teardown())
 
+        with self.subTest("feed"):
+            val.setup()
+            self.assertFalse(val.feed(("ok", "fail")).teardown())
+            self.assertTrue(val.feed(("fail", "ok")).teardown())
+
+        with self.subTest("batch"):
+            self.assertFalse(val.validate_batch(("ok", "fail")))
+            self.assertTrue(val.validate_batch(("ok", "fail", "ok")))
+            self.assertTrue(val.teardown())
+
     def test_complex_count_validator(self):
         val = t.ItemAndValidator(
             t.ItemCountValidator(t.ItemStringValidator("ok"),
@@ -115,31 +157,32 @@ class ItemValidatorsTests(unittest.TestCase):
         self.assertTrue(val("STRING"))
         self.assertFalse(val("wrong"))
 
-
-def check_ok(func):
-    @functools.wraps(func)
-    def wrapper(self):
-        func(self)
-        self.assertTrue(
-            t.ConfigSchemaValidator(self.schema).validate(self.cfg))
-    return wrapper
-
-
-def check_fail(func):
-    @functools.wraps(func)
-    def wrapper(self):
-        func(self)
-        with self.assertRaises(t.ConfigError):
-            t.ConfigSchemaValidator(self.schema).validate(self.cfg)
-    return wrapper
+    def test_slots(self):
+        string = t.ItemStringValidator("string")
+        for val in (t.ItemDefaultValidator(), string,
+                    t.ItemRegexValidator(r'.*'), t.ItemNumberValidator(),
+                    t.ItemNotValidator(string), t.ItemOrValidator(string),
+                    t.ItemAndValidator(string),
+                    t.ItemCountValidator(string, bool),
+                    t.item_validator("TestVal", bool)()):
+            with self.subTest(type(val).__name__):
+                self.assertFalse(hasattr(val, '__dict__'))
 
 
 class ConfigValidatorTest(unittest.TestCase):
     def setUp(self):
         self.cfg = ConfigParser()
         self.schema = t.ConfigSchema()
+        self.validator = t.ConfigSchemaValidator(self.schema)
+
+    def _finish(self, ok):
+        for config in (self.cfg, t.ConfigSnapshot(self.cfg)):
+            if ok:
+                self.assertTrue(self.validator.validate(config))
+            else:
+                with self.assertRaises(t.ConfigError):
+                    self.validator.validate(config)
 
-    @check_ok
     def test_sections_ok(self):
         self.cfg.read_string("""
         [GLOBAL]
@@ -156,7 +199,8 @@ class ConfigValidatorTest(unittest.TestCase):
         with self.schema.section("DATA"): pass
         with self.schema.section("OPTIONAL", required=False): pass
 
-    @check_ok
+        self._finish(True)
+
     def test_sections_noother_ok(self):
         self.cfg.read_string("""
         [GLOBAL]
@@ -167,7 +211,8 @@ class ConfigValidatorTest(unittest.TestCase):
         with self.schema.section("OTHER", required=False): pass
         self.schema.no_other()
 
-    @check_fail
+        self._finish(True)
+
     def test_sections_noother_fail(self):
         self.cfg.read_string("""
         [GLOBAL]
@@ -179,7 +224,8 @@ class ConfigValidatorTest(unittest.TestCase):
         with self.schema.section("GLOBAL"): pass
         self.schema.no_other()
 
-    @check_fail
+        self._finish(False)
+
     def test_sections_fail(self):
         self.cfg.read_string("""
         [GLOBAL]
@@ -192,7 +238,8 @@ class ConfigValidatorTest(unittest.TestCase):
         with self.schema.section("DATA"): pass
         with self.schema.section("OPTIONAL", required=False): pass
 
-    @check_ok
+        self._finish(False)
+
     def test_sections_multi_ok(self):
         self.cfg.read_string("""
         [SECT_1]
@@ -205,7 +252,8 @@ class ConfigValidatorTest(unittest.TestCase):
         with self.schema.section(t.ItemRegexValidator(r'SECT_\d+')): pass
         self.schema.no_other()
 
-    @check_fail
+        self._finish(True)
+
     def test_sections_multi_fail(self):
         self.cfg.read_string("""
         [SECT_1]
@@ -220,7 +268,21 @@ class ConfigValidatorTest(unittest.TestCase):
         with self.schema.section(t.ItemRegexValidator(r'SECT_\d+')): pass
         self.schema.no_other()
 
-    @check_ok
+        self._finish(False)
+
+    def test_sections_order_ok(self):
+        self.cfg.read_string("""
+        [SECT_1]
+        [SECT]
+        """)
+
+        with self.schema.section(t.ItemCountValidator(
+            t.ItemRegexValidator(r'SECT.*'), lambda x: x == 2)): pass
+        with self.schema.section("SECT", required=False) as s:
+            s.value("key")
+
+        self._finish(True)
+
     def test_values_ok(self):
         self.cfg.read_string("""
         [GLOBAL]
@@ -241,7 +303,8 @@ class ConfigValidatorTest(unittest.TestCase):
 
         self.schema.no_other()
 
-    @check_fail
+        self._finish(True)
+
     def test_values_key_fail(self):
         self.cfg.read_string("""
         [GLOBAL]
@@ -252,7 +315,8 @@ class ConfigValidatorTest(unittest.TestCase):
         with self.schema.section("GLOBAL") as s:
             s.value("key").no_other()
 
-    @check_fail
+        self._finish(False)
+
     def test_values_value_fail(self):
         self.cfg.read_string("""
         [GLOBAL]
@@ -262,7 +326,8 @@ class ConfigValidatorTest(unittest.TestCase):
         with self.schema.section("GLOBAL") as s:
             s.value("key", value_val="value").no_other()
 
-    @check_ok
+        self._finish(False)
+
     def test_values_opt_ok(self):
         self.cfg.read_string("""
         [GLOBAL]
@@ -272,7 +337,8 @@ class ConfigValidatorTest(unittest.TestCase):
         with self.schema.section("GLOBAL") as s:
             s.value("key").value("optional", required=False).no_other()
 
-    @check_ok
+        self._finish(True)
+
     def test_sections_counter_ok_req(self):
         self.cfg.read_string("""
         [SECT_1]
@@ -287,7 +353,8 @@ class ConfigValidatorTest(unittest.TestCase):
         with self.schema.section(t.ItemCountValidator(
             t.ItemRegexValidator(r'SECT_\d+'), lambda x: x > 1)): pass
 
-    @check_ok
+        self._finish(True)
+
     def test_sections_counter_ok_opt(self):
         self.cfg.read_string("""
         [GLOBAL]
@@ -303,7 +370,8 @@ class ConfigValidatorTest(unittest.TestCase):
             t.ItemRegexValidator(r'OPT_\d+'), lambda x: x > 1),
             required=False): pass
 
-    @check_fail
+        self._finish(True)
+
     def test_sections_counter_fail_req(self):
         self.cfg.read_string("""
         [SECT_1]
@@ -315,7 +383,8 @@ class ConfigValidatorTest(unittest.TestCase):
         with self.schema.section(t.ItemCountValidator(
             t.ItemRegexValidator(r'SECT_\d+'), lambda x: x > 1)): pass
 
-    @check_fail
+        self._finish(False)
+
     def test_sections_counter_fail_opt(self):
         self.cfg.read_string("""
         [GLOBAL]
@@ -328,7 +397,8 @@ class ConfigValidatorTest(unittest.TestCase):
             t.ItemRegexValidator(r'OPT_\d+'), lambda x: x > 1),
             required=False): pass
 
-    @check_ok
+        self._finish(False)
+
     def test_values_counter_ok_req(self):
         self.cfg.read_string("""
         [GLOBAL]
@@ -341,7 +411,8 @@ class ConfigValidatorTest(unittest.TestCase):
             s.value(t.ItemCountValidator(
                 t.ItemRegexValidator(r'key_\d+'), lambda x: x > 1))
 
-    @check_ok
+        self._finish(True)
+
     def test_values_counter_ok_opt(self):
         self.cfg.read_string("""
         [GLOBAL]
@@ -355,7 +426,8 @@ class ConfigValidatorTest(unittest.TestCase):
                 t.ItemRegexValidator(r'opt_\d+'), lambda x: x > 1),
                 required=False)
 
-    @check_fail
+        self._finish(True)
+
     def test_values_counter_fail_req(self):
         self.cfg.read_string("""
         [GLOBAL]
@@ -367,7 +439,8 @@ class ConfigValidatorTest(unittest.TestCase):
             s.value(t.ItemCountValidator(
                 t.ItemRegexValidator(r'key_\d+'), lambda x: x > 1))
 
-    @check_fail
+        self._finish(False)
+
     def test_values_counter_fail_opt(self):
         self.cfg.read_string("""
         [GLOBAL]
@@ -380,6 +453,200 @@ class ConfigValidatorTest(unittest.TestCase):
                 t.ItemRegexValidator(r'opt_\d+'), lambda x: x > 1),
                 required=False)
 
+        self._finish(False)
+
+    def test_values_order_ok(self):
+        self.cfg.read_string("""
+        [GLOBAL]
+        key = value
+        key_1 = value1
+        """)
+
+        with self.schema.section("GLOBAL") as s:
+            s.value(t.ItemCountValidator(
+                t.ItemRegexValidator(r'key.*'), lambda x: x == 2))
+            s.value("key", required=False).no_other()
+
+        self._finish(True)
+
+    def test_values_counter_literal_ok(self):
+        self.cfg.read_string("""
+        [GLOBAL]
+        key = value
+        opt = optional
+        """)
+
+        with self.schema.section("GLOBAL") as s:
+            s.value(t.ItemCountValidator(
+                t.ItemStringValidator("key"), lambda x: x == 1))
+            s.value(t.ItemCountValidator(
+                t.ItemStringValidator("other"), lambda x: x == 0),
+                required=False)
+
+        self._finish(True)
+
+    def test_values_counter_literal_fail(self):
+        self.cfg.read_string("""
+        [GLOBAL]
+        key = value
+        """)
+
+        with self.schema.section("GLOBAL") as s:
+            s.value(t.ItemCountValidator(
+                t.ItemStringValidator("key"), lambda x: x > 1))
+
+        self._finish(False)
+
+    def test_values_multi_regex_ok(self):
+        self.cfg.read_string("""
+        [GLOBAL]
+        key_1 = 5
+        key_a = x
+        opt = y
+        """)
+
+        with self.schema.section("GLOBAL") as s:
+            s.value(t.ItemRegexValidator(r'key_\d+'),
+                    value_val=t.ItemNumberValidator())
+            s.value(t.ItemRegexValidator(r'key_.*'), value_val="x")
+            s.value(t.ItemRegexValidator(r'o.*'), value_val="y")
+            s.value(t.ItemRegexValidator(r'KEY_\d+', ignore_case=True),
+                    required=False, value_val="z")
+            s.value(t.ItemRegexValidator(r'KEY_.+'), required=False)
+            s.no_other()
+
+        self._finish(True)
+
+    def test_sections_fused_ok(self):
+        self.cfg.read_string("""
+        [GLOBAL]
+        key = 1
+
+        [SECT_1]
+        [OPT.1]
+        """)
+
+        with self.schema.section(t.ItemOrValidator(
+            t.ItemStringValidator("GLOBAL"),
+            t.ItemRegexValidator(r'SECT_\d+'),
+            t.ItemStringValidator("OPT.1"))) as s:
+            s.value(t.ItemOrValidator(
+                t.ItemStringValidator("key"), t.ItemStringValidator("k")),
+                required=False,
+                value_val=t.ItemOrValidator(
+                    t.ItemNumberValidator(), t.ItemStringValidator("x")))
+
+        self.schema.no_other()
+
+        self._finish(True)
+
+    def test_sections_fused_fail(self):
+        self.cfg.read_string("""
+        [GLOBAL]
+        [OPTx1]
+        """)
+
+        with self.schema.section(t.ItemOrValidator(
+            t.ItemStringValidator("GLOBAL"),
+            t.ItemStringValidator("OPT.1"))): pass
+
+        self.schema.no_other()
+
+        self._finish(False)
+
+    def test_values_interpolation_ok(self):
+        self.cfg.read_string("""
+        [DEFAULT]
+        base = 10
+
+        [GLOBAL]
+        key = %(base)s0
+        """)
+
+        with self.schema.section("GLOBAL") as s:
+            s.value("key", value_val="100")
+            s.value("base", value_val="10").no_other()
+
+        self._finish(True)
+
+    def test_values_defaults_fail(self):
+        self.cfg.read_string("""
+        [DEFAULT]
+        base = 10
+
+        [GLOBAL]
+        key = value
+        """)
+
+        with self.schema.section("GLOBAL") as s:
+            s.value("key").no_other()
+
+        self._finish(False)
+
+    def test_value_error_before_interpolation(self):
+        self.cfg.read_string("""
+        [S]
+        port = abc
+        url = %(host)s/x
+        """)
+
+        with self.schema.section("S") as s:
+            s.value("port", value_val=t.ItemNumberValidator())
+            s.value("url")
+
+        with self.assertRaises(t.ValueValidationError):
+            self.validator.validate(self.cfg)
+
+    def test_snapshot_interpolates_all_sections(self):
+        self.cfg.read_string("""
+        [A]
+        k = v
+
+        [LEGACY]
+        path = %(missing)s/x
+        """)
+
+        with self.schema.section("A"): pass
+
+        self.assertTrue(self.validator.validate(self.cfg))
+        with self.assertRaises(configparser.InterpolationError):
+            t.ConfigSnapshot(self.cfg)
+
+    def test_raw_parser(self):
+        self.cfg = RawConfigParser()
+        self.cfg.read_string("""
+        [GLOBAL]
+        key = %(value)s
+        """)
+
+        with self.schema.section("GLOBAL") as s:
+            s.value("key", value_val="%(value)s").no_other()
+
+        self._finish(True)
+
+    def test_schema_changed_after_validation(self):
+        self.cfg.read_string("""
+        [GLOBAL]
+        key = value
+        """)
+
+        with self.schema.section("GLOBAL") as s:
+            s.value("key")
+
+        validator = t.ConfigSchemaValidator(self.schema.finalize())
+        self.assertTrue(validator.validate(self.cfg))
+
+        s.value("other")
+        with self.assertRaises(t.ConfigError):
+            validator.validate(self.cfg)
+
+        self.cfg.set("GLOBAL", "other", "value")
+        self.assertTrue(validator.validate(self.cfg))
+
+        with self.schema.section("DATA"): pass
+        with self.assertRaises(t.ConfigError):
+            validator.validate(self.cfg)
+
 
 if __name__ == '__main__':
     unittest.main()